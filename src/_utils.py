@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+_utils.py
+複数モジュールで重複していた小さなヘルパーを1箇所に集約する。
+
+- env: 環境変数（strip 済み、空なら default）。初回参照時に os.environ を1回だけスナップショット
+- posix_path: Dropbox パスの正規化（区切りを / に、末尾 / なし）
+- utc_now_iso / utc_stamp / jst_date_yyyymmdd: 時刻フォーマット
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+_JST = timezone(timedelta(hours=9))
+
+# env はプロセス起動時に Actions から注入され、実行中は変わらない前提。
+# 未設定キーも含めて dict 1回の get で済ませる。
+_ENV_SNAPSHOT: Optional[Dict[str, str]] = None
+
+
+def _env_snapshot() -> Dict[str, str]:
+    global _ENV_SNAPSHOT
+    if _ENV_SNAPSHOT is None:
+        _ENV_SNAPSHOT = {k: v.strip() for k, v in os.environ.items()}
+    return _ENV_SNAPSHOT
+
+
+def reload_env() -> None:
+    """os.environ を書き換えた後に呼ぶ（次の env() で取り直す）。"""
+    global _ENV_SNAPSHOT
+    _ENV_SNAPSHOT = None
+
+
+def env(key: str, default: str = "") -> str:
+    return _env_snapshot().get(key) or default
+
+
+def posix_path(p: str) -> str:
+    """区切りを / に揃え、末尾の / を落とす。空は空のまま（未設定判定を壊さない）、ルートは "/"。"""
+    if not p:
+        return ""
+    return p.replace("\\", "/").rstrip("/") or "/"
+
+
+def utc_now_iso() -> str:
+    # 例: 2025-01-31T12:34:56Z（isoformat + replace と同じ文字列を strftime 1回で）
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def utc_stamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+
+
+def jst_date_yyyymmdd() -> str:
+    # runner は UTC だが、フォルダは JST 揃えが分かりやすい（ローカル時刻にせず UTC+9 を明示）
+    return datetime.now(_JST).strftime("%Y%m%d")
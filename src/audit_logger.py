@@ -8,16 +8,13 @@ Write JSONL audit logs to Dropbox.
 """
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+from ._utils import utc_now_iso
 from .dropbox_io import DropboxIO
-
-
-def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+from .json_codec import dumps_bytes
 
 
 def _today_utc_ymd() -> str:
@@ -37,10 +34,10 @@ class AuditLogger:
 
     def write(self, record: Dict[str, Any]) -> None:
         rec = dict(record)
-        rec.setdefault("timestamp", _utc_now_iso())
+        rec.setdefault("timestamp", utc_now_iso())
         rec.setdefault("run_id", self.run_id)
 
-        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        line = dumps_bytes(rec) + b"\n"
         path = self._log_path()
 
         try:
@@ -2,14 +2,16 @@
 from __future__ import annotations
 
 import io
-import os
+import posixpath
 import time
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Tuple
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import dropbox
 from dropbox.exceptions import ApiError
-from dropbox.files import FileMetadata, FolderMetadata
+from dropbox.files import FileMetadata, FolderMetadata, RelocationPath
+
+from ._utils import posix_path, utc_stamp
 
 
 @dataclass(frozen=True)
@@ -21,6 +23,50 @@ class DbxEntry:
     rev: str = ""
 
 
+# Dropbox accepts at most 1000 entries per copy/move batch call.
+_RELOCATION_BATCH_MAX = 1000
+
+
+def _wait_batch(check_fn: Callable[..., Any], job_id: str, *, max_wait_s: float = 300.0) -> Any:
+    """Poll an async batch job with exponential backoff (0.5s .. 8s) until it completes."""
+    delay, waited = 0.5, 0.0
+    while True:
+        status = check_fn(job_id)
+        if status.is_complete():
+            return status.get_complete()
+        if waited >= max_wait_s:
+            raise RuntimeError(f"Dropbox batch job did not complete in {max_wait_s}s: job_id={job_id!r}")
+        time.sleep(delay)
+        waited += delay
+        delay = min(delay * 2, 8.0)
+
+
+def relocation_batch(client: dropbox.Dropbox, pairs: List[Tuple[str, str]], *,
+                     move: bool = False, autorename: bool = False) -> List[Any]:
+    """
+    Copy (or move) many (src, dst) pairs with files_copy_batch_v2 / files_move_batch_v2,
+    chunked to the 1000-entry API limit and polled until complete.
+    Returns the RelocationBatchResultEntry for each pair, in order (check is_success()).
+    Raises ApiError if a whole batch call fails.
+    """
+    if move:
+        launch_fn, check_fn = client.files_move_batch_v2, client.files_move_batch_check_v2
+    else:
+        launch_fn, check_fn = client.files_copy_batch_v2, client.files_copy_batch_check_v2
+
+    results: List[Any] = []
+    for i in range(0, len(pairs), _RELOCATION_BATCH_MAX):
+        part = pairs[i:i + _RELOCATION_BATCH_MAX]
+        entries = [RelocationPath(from_path=src, to_path=dst) for src, dst in part]
+        launch = launch_fn(entries, autorename=autorename)
+        if launch.is_async_job_id():
+            result = _wait_batch(check_fn, launch.get_async_job_id())
+        else:
+            result = launch.get_complete()
+        results.extend(result.entries)
+    return results
+
+
 class DropboxIO:
     """
     Thin wrapper around Dropbox SDK with a few safe helpers.
@@ -45,26 +91,30 @@ class DropboxIO:
         return getattr(acct, "email", "")
 
     def list_folder(self, path: str) -> List[DbxEntry]:
+        """List direct children of `path`, following has_more/cursor pages."""
         out: List[DbxEntry] = []
         try:
             res = self.dbx.files_list_folder(path)
+            while True:
+                for e in res.entries:
+                    if isinstance(e, FileMetadata):
+                        out.append(
+                            DbxEntry(
+                                path=e.path_display or "",
+                                name=e.name or "",
+                                is_file=True,
+                                size=int(getattr(e, "size", 0) or 0),
+                                rev=str(getattr(e, "rev", "") or ""),
+                            )
+                        )
+                    elif isinstance(e, FolderMetadata):
+                        out.append(DbxEntry(path=e.path_display or "", name=e.name or "", is_file=False))
+                if not res.has_more:
+                    break
+                res = self.dbx.files_list_folder_continue(res.cursor)
         except ApiError as e:
             raise RuntimeError(f"Dropbox list_folder failed: path={path!r} err={e}") from e
 
-        entries = res.entries
-        for e in entries:
-            if isinstance(e, FileMetadata):
-                out.append(
-                    DbxEntry(
-                        path=e.path_display or "",
-                        name=e.name or "",
-                        is_file=True,
-                        size=int(getattr(e, "size", 0) or 0),
-                        rev=str(getattr(e, "rev", "") or ""),
-                    )
-                )
-            elif isinstance(e, FolderMetadata):
-                out.append(DbxEntry(path=e.path_display or "", name=e.name or "", is_file=False))
         return out
 
     def download(self, path: str) -> bytes:
@@ -127,9 +177,8 @@ class DropboxIO:
         - Ensure temp upload completes,
         - Then overwrite target using that same bytes if needed.
         """
-        folder = os.path.dirname(target_path).replace("\\", "/")
-        base = os.path.basename(target_path)
-        ts = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        folder, base = posixpath.split(posix_path(target_path))
+        ts = utc_stamp()
         tmp_path = f"{folder}/{base}{suffix}.{ts}"
 
         # 1) upload tmp
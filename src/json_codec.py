@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+json_codec.py
+state.json / 監査 JSONL のシリアライズを一箇所にまとめる。
+
+- orjson があれば使う（bytes を直接返すので .encode("utf-8") が不要）
+- 無ければ stdlib json にフォールバック（出力は同じく UTF-8 / 非ASCIIそのまま / 区切りに空白なし）
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """obj を UTF-8 の JSON bytes にする（区切りに空白なし）。"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
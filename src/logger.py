@@ -1,21 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import json
-import time
 from typing import Any, Dict, Optional
 
+from ._utils import jst_date_yyyymmdd, utc_now_iso
 from .dropbox_io import DropboxIO
-
-
-def _jst_date() -> str:
-    # keep it simple: JST folder name. (UTC+9)
-    t = time.time() + 9 * 3600
-    return time.strftime("%Y%m%d", time.gmtime(t))
-
-
-def _utc_ts() -> str:
-    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+from .json_codec import dumps_bytes
 
 
 class JsonlLogger:
@@ -29,17 +19,17 @@ class JsonlLogger:
 
     def log(self, obj: Dict[str, Any]) -> None:
         try:
-            day = _jst_date()
+            day = jst_date_yyyymmdd()
             path_dir = f"{self.logs_dir}/{day}"
             self.io.ensure_folder(self.logs_dir)
             self.io.ensure_folder(path_dir)
 
-            ts = _utc_ts().replace(":", "").replace("-", "")
+            ts = utc_now_iso().replace(":", "").replace("-", "")
             path = f"{path_dir}/run_{ts}.jsonl"
 
             obj = dict(obj)
-            obj.setdefault("ts_utc", _utc_ts())
-            payload = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+            obj.setdefault("ts_utc", utc_now_iso())
+            payload = dumps_bytes(obj) + b"\n"
 
             # Read existing (if any) then append (Dropbox SDK has upload_session for true append,
             # but for simplicity in early stage we overwrite with appended content if exists.)
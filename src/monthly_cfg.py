@@ -2,12 +2,9 @@
 
 from __future__ import annotations
 
-import os
 from dataclasses import dataclass
 
-
-def _env(key: str, default: str = "") -> str:
-    return os.environ.get(key, default).strip()
+from ._utils import env as _env
 
 
 def _must_env(key: str) -> str:
@@ -9,7 +9,6 @@ monthly_main.py
 from __future__ import annotations
 
 import importlib
-import json
 import os
 import sys
 import time
@@ -20,27 +19,11 @@ from typing import Any, Dict, List, Optional
 import dropbox
 from dropbox.exceptions import ApiError
 
+from ._utils import env as safe_env, jst_date_yyyymmdd, posix_path, utc_now_iso
+from .json_codec import dumps_bytes
 from .state_store import StateStore
 
 
-def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-
-
-def jst_date_yyyymmdd() -> str:
-    # runner は UTC だが、フォルダは JST 揃えが分かりやすい前提（必要ならUTCに変えてOK）
-    # ただしここはローカル時刻にせず、UTC+9 を明示して計算する
-    import datetime as _dt
-
-    tz = _dt.timezone(_dt.timedelta(hours=9))
-    return _dt.datetime.now(tz).strftime("%Y%m%d")
-
-
-def safe_env(key: str, default: str = "") -> str:
-    v = os.environ.get(key, "")
-    return v if v is not None and str(v).strip() != "" else default
-
-
 @dataclass
 class Paths:
     in_path: str
@@ -53,12 +36,19 @@ class Paths:
 class AuditLogger:
     """
     Dropboxに jsonl を書く。失敗したら stdout にフォールバック。
-    1行=1イベント。
+    1行=1イベント。write() はメモリに貯めるだけで、flush() で run 全体のログを1回アップロードする。
+    長い run でも途中経過が残るよう、未出力が FLUSH_MAX_PENDING 行 or 前回から FLUSH_INTERVAL_S 秒
+    たまったときだけ途中 flush する（イベントごとのアップロードはしない）。
     """
+    FLUSH_INTERVAL_S = 30.0
+    FLUSH_MAX_PENDING = 500
+
     def __init__(self, dbx: dropbox.Dropbox, logs_dir: str):
         self.dbx = dbx
         self.logs_dir = logs_dir or ""
-        self.buf: List[str] = []
+        self.buf: List[bytes] = []  # run 内の全行（シリアライズ済み）
+        self.flushed = 0            # buf のうち出力済みの行数
+        self.last_flush = time.monotonic()
         self.log_path: Optional[str] = None
 
     def _ensure_log_path(self) -> Optional[str]:
@@ -80,46 +70,48 @@ class AuditLogger:
         return self.log_path
 
     def write(self, event: Dict[str, Any]) -> None:
-        line = json.dumps(event, ensure_ascii=False)
-        self.buf.append(line)
-
-        # 小さくても都度 flush（「途中で死んでもログが残る」優先）
-        self.flush()
+        self.buf.append(dumps_bytes(event))
+        if (len(self.buf) - self.flushed >= self.FLUSH_MAX_PENDING
+                or time.monotonic() - self.last_flush >= self.FLUSH_INTERVAL_S):
+            self.flush()
 
     def flush(self) -> None:
+        self.last_flush = time.monotonic()
+        if self.flushed == len(self.buf):
+            return
+        new_lines = self.buf[self.flushed:]
+        self.flushed = len(self.buf)
+
         path = self._ensure_log_path()
         if not path:
-            # logs_dir が無いなら stdout に出すだけ
-            for line in self.buf:
-                print(line, flush=True)
-            self.buf = []
+            # logs_dir が無いなら stdout に出すだけ（行ごとの print ではなく1回の write）
+            sys.stdout.write((b"\n".join(new_lines) + b"\n").decode("utf-8"))
+            sys.stdout.flush()
             return
 
-        payload = ("\n".join(self.buf) + "\n").encode("utf-8")
-        self.buf = []
-
         try:
             import dropbox as _dropbox
-            # append したいが Dropbox は append API が弱いので「download+concat+overwrite」は避ける
-            # 代わりに upload で "add" する（毎回別runファイルなのでOK）
-            # ここは「ファイルが存在しない前提」なので overwrite でよい
+            # Dropbox は append API が弱いので、run のログ全体を1ファイルとして上書きする
+            # （run ごとに別ファイルなので、他の run のログは壊さない）
+            payload = b"\n".join(self.buf) + b"\n"
             self.dbx.files_upload(payload, path, mode=_dropbox.files.WriteMode.overwrite)
         except Exception:
-            # 最後の砦：stdout
+            # 最後の砦：stdout（未出力分だけ）
             print("[warn] write_audit_record failed; fallback to stdout", file=sys.stderr, flush=True)
-            print(payload.decode("utf-8", errors="replace"), flush=True)
+            print((b"\n".join(new_lines)).decode("utf-8", errors="replace"), flush=True)
 
 
 def stage_paths(stage: str) -> Paths:
+    # パスは実行中不変なので、ここで1回だけ正規化しておく
     def pick(kind: str) -> str:
-        return safe_env(f"STAGE{stage}_{kind}")
+        return posix_path(safe_env(f"STAGE{stage}_{kind}"))
 
     return Paths(
         in_path=pick("IN"),
         out_path=pick("OUT"),
         done_path=pick("DONE"),
-        state_path=safe_env("STATE_PATH"),
-        logs_dir=safe_env("LOGS_DIR"),
+        state_path=posix_path(safe_env("STATE_PATH")),
+        logs_dir=posix_path(safe_env("LOGS_DIR")),
     )
 
 
@@ -157,6 +149,14 @@ def main() -> int:
     dbx = dropbox.Dropbox(oauth2_refresh_token=tok, app_key=app_key, app_secret=app_secret)
     audit = AuditLogger(dbx, paths.logs_dir)
 
+    # ログは run の終わりに1回だけアップロード（例外で抜けても必ず flush）
+    try:
+        return _run(stage, paths, dbx, audit)
+    finally:
+        audit.flush()
+
+
+def _run(stage: str, paths: Paths, dbx: dropbox.Dropbox, audit: AuditLogger) -> int:
     t0 = time.time()
     audit.write({
         "ts_utc": utc_now_iso(),
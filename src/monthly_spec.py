@@ -9,15 +9,9 @@ monthly_spec.py
 
 from __future__ import annotations
 
-import os
 from dataclasses import dataclass
 
-
-def _env(name: str, default: str = "") -> str:
-    v = os.environ.get(name)
-    if v is None:
-        return default
-    return str(v).strip() or default
+from ._utils import env as _env
 
 
 @dataclass
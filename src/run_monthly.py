@@ -16,6 +16,7 @@ import argparse
 import os
 import sys
 
+from src._utils import reload_env
 from src.monthly_main import main as monthly_main
 
 
@@ -50,6 +51,9 @@ def main(argv: list[str] | None = None) -> int:
     _set_if(ns.max_output_tokens, "OPENAI_MAX_OUTPUT_TOKENS")
     _set_if(ns.timeout, "OPENAI_TIMEOUT")
 
+    # env は snapshot 参照なので、書き換えた後に取り直させる
+    reload_env()
+
     return int(monthly_main())
 
 
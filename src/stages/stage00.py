@@ -9,16 +9,16 @@ stage00.py
 
 from __future__ import annotations
 
-import os
-from datetime import datetime, timezone
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 import dropbox
 from dropbox.exceptions import ApiError
+from dropbox.files import FileMetadata
 
-
-def utc_stamp() -> str:
-    return datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+from .._utils import utc_now_iso, utc_stamp
+from ..dropbox_io import relocation_batch
 
 
 def safe_mkdir(dbx: dropbox.Dropbox, path: str) -> None:
@@ -30,114 +30,170 @@ def safe_mkdir(dbx: dropbox.Dropbox, path: str) -> None:
         pass
 
 
-def list_files(dbx: dropbox.Dropbox, folder: str):
-    res = dbx.files_list_folder(folder)
-    return [e for e in res.entries if type(e).__name__ == "FileMetadata"]
+def list_files(dbx: dropbox.Dropbox, folder: str, limit: Optional[int] = None) -> Iterator[FileMetadata]:
+    """
+    folder 直下のファイルを順に返す（has_more なら continue で次ページへ。必要な分だけ取る）。
+    limit を渡すとページサイズもそこまで絞る（取り切る前に打ち切る呼び出し側向け）。
+    """
+    if limit:
+        res = dbx.files_list_folder(folder, limit=min(int(limit), 2000))
+    else:
+        res = dbx.files_list_folder(folder)
+    while True:
+        for e in res.entries:
+            if isinstance(e, FileMetadata):
+                yield e
+        if not res.has_more:
+            return
+        res = dbx.files_list_folder_continue(res.cursor)
 
 
-def run(*, dbx, paths, state, audit, config: Dict[str, Any], **kwargs) -> int:
-    # フォルダ前提チェック
-    for k in ["in_path", "out_path", "done_path"]:
-        v = getattr(paths, k, "")
-        if not v:
-            audit.write({
-                "ts_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
-                "event": "error",
-                "where": "stage00",
-                "message": f"missing required path: {k}",
-            })
-            return 2
+def _targets(f: FileMetadata, out_dir: str, done_dir: str, run_tag: str) -> Tuple[str, str]:
+    """1ファイル分の (OUT のコピー先, DONE の移動先)。"""
+    base = f.path_display.rpartition("/")[2]
+    # os.path.splitext と同じ分け方（先頭のドットは拡張子扱いしない）を rpartition 1回で
+    head, dot, tail = base.rpartition(".")
+    stem, ext = (head, dot + tail) if head.lstrip(".") else (base, "")
 
-    safe_mkdir(dbx, paths.out_path)
-    safe_mkdir(dbx, paths.done_path)
+    # OUT は “コピー” として保存（名前に stage + timestamp）
+    out_path = f"{out_dir}/{stem}__stage00__{run_tag}{ext}"
 
-    # 1) marker を必ず作る（RUNが実際に stage00 に入った証拠）
-    marker_name = f"_stage00_marker__{utc_stamp()}.txt"
-    marker_path = f"{paths.out_path.rstrip('/')}/{marker_name}"
-    try:
-        dbx.files_upload(
-            f"stage00 alive at {utc_stamp()} UTC\n".encode("utf-8"),
-            marker_path,
-            mode=dropbox.files.WriteMode.add,
-        )
-        audit.write({
-            "ts_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
-            "event": "stage00_marker_written",
-            "path": marker_path,
-        })
-    except Exception as e:
-        audit.write({
-            "ts_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
-            "event": "warn",
-            "where": "stage00.marker",
-            "error": f"{type(e).__name__}: {e}",
-        })
-        # marker が書けないのは運用上致命なので落とす
-        return 1
+    # DONE は “move” でアーカイブ（rev付きで衝突回避しやすい）
+    done_path = f"{done_dir}/{stem}__rev-{f.rev}__{run_tag}{ext}"
+    return out_path, done_path
 
-    # 2) IN のファイルを処理（最大 MAX_FILES_PER_RUN）
-    try:
-        files = list_files(dbx, paths.in_path)
-    except ApiError as e:
+
+def _entry_error(entry: Any) -> str:
+    """バッチ結果 1件の失敗内容。failure 以外のタグ（other 等）は get_failure() が投げるので repr で残す。"""
+    if entry.is_failure():
+        err = entry.get_failure()
+        return f"{type(err).__name__}: {err}"
+    return repr(entry)
+
+
+def run(*, dbx, paths, state, audit, config: Dict[str, Any], **kwargs) -> int:
+    # フォルダ前提チェック（足りないものはまとめて1件で記録）
+    in_p, out_p, done_p = paths.in_path, paths.out_path, paths.done_path
+    missing = [k for k, v in (("in_path", in_p), ("out_path", out_p), ("done_path", done_p)) if not v]
+    if missing:
         audit.write({
-            "ts_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+            "ts_utc": utc_now_iso(),
             "event": "error",
-            "where": "stage00.list",
-            "error": str(e),
+            "where": "stage00",
+            "message": f"missing required path: {', '.join(missing)}",
+            "missing": missing,
         })
-        return 1
+        return 2
 
-    max_n = int(str(config.get("MAX_FILES_PER_RUN", "200")))
-    files = files[:max_n]
+    # 末尾 / を落としたパスは run 中ずっと使い回す
+    out_dir = out_p.rstrip("/")
+    done_dir = done_p.rstrip("/")
 
-    processed = 0
+    safe_mkdir(dbx, out_p)
+    safe_mkdir(dbx, done_p)
 
-    for f in files:
-        src = f.path_display
-        base = os.path.basename(src)
+    # run 内のファイル名は同一タイムスタンプで揃える（毎ファイル時計を読まない）
+    run_tag = utc_stamp()
+
+    # 1) marker を必ず作る（RUNが実際に stage00 に入った証拠）
+    marker_name = f"_stage00_marker__{run_tag}.txt"
+    marker_path = f"{out_dir}/{marker_name}"
+    max_n = int(str(config.get("MAX_FILES_PER_RUN", "200")))
 
-        # OUT は “コピー” として保存（名前に stage + timestamp）
-        out_name = f"{os.path.splitext(base)[0]}__stage00__{utc_stamp()}{os.path.splitext(base)[1]}"
-        out_path = f"{paths.out_path.rstrip('/')}/{out_name}"
+    # marker の upload と 2) IN の一覧は互いに独立なので同時に投げる（結果の扱いは従来どおりの順）
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        marker_fut = ex.submit(
+            dbx.files_upload,
+            f"stage00 alive at {run_tag} UTC\n".encode("utf-8"),
+            marker_path,
+            mode=dropbox.files.WriteMode.add,
+        )
+        # 先頭 max_n 件で打ち切り（残りのページは取りに行かない）
+        list_fut = ex.submit(lambda: list(islice(list_files(dbx, in_p, limit=max_n), max_n)))
 
-        # DONE は “move” でアーカイブ（rev付きで衝突回避しやすい）
-        done_name = f"{os.path.splitext(base)[0]}__rev-{getattr(f, 'rev', 'unknown')}__{utc_stamp()}{os.path.splitext(base)[1]}"
-        done_path = f"{paths.done_path.rstrip('/')}/{done_name}"
+        try:
+            marker_fut.result()
+            audit.write({
+                "ts_utc": utc_now_iso(),
+                "event": "stage00_marker_written",
+                "path": marker_path,
+            })
+        except Exception as e:
+            audit.write({
+                "ts_utc": utc_now_iso(),
+                "event": "warn",
+                "where": "stage00.marker",
+                "error": f"{type(e).__name__}: {e}",
+            })
+            # marker が書けないのは運用上致命なので落とす
+            return 1
 
+        # 2) IN のファイルを処理（最大 MAX_FILES_PER_RUN）
         try:
-            # copy -> OUT
-            dbx.files_copy_v2(src, out_path, allow_shared_folder=True, autorename=True)
-            # move -> DONE
-            dbx.files_move_v2(src, done_path, allow_shared_folder=True, autorename=True)
+            files = list_fut.result()
+        except ApiError as e:
+            audit.write({
+                "ts_utc": utc_now_iso(),
+                "event": "error",
+                "where": "stage00.list",
+                "error": str(e),
+            })
+            return 1
+
+    srcs = [f.path_display for f in files]
+    targets = [_targets(f, out_dir, done_dir, run_tag) for f in files]
+
+    # copy -> OUT を1バッチ、copy できたものだけ move -> DONE をもう1バッチ（ファイルごとの往復をしない）
+    try:
+        copied = relocation_batch(dbx, [(src, out) for src, (out, _) in zip(srcs, targets)], autorename=True)
+        ok = [i for i, r in enumerate(copied) if r.is_success()]
+        moved = relocation_batch(dbx, [(srcs[i], targets[i][1]) for i in ok], move=True, autorename=True)
+    except Exception as e:
+        audit.write({
+            "ts_utc": utc_now_iso(),
+            "event": "stage00_error",
+            "where": "stage00.batch",
+            "error": f"{type(e).__name__}: {e}",
+        })
+        return 1
+    moved_at = dict(zip(ok, moved))
 
+    processed = 0
+    failed = False
+    for i, src in enumerate(srcs):
+        c, m = copied[i], moved_at.get(i)
+        if m is not None and m.is_success():
             processed += 1
+            # autorename で名前が変わることがあるので、実際のパスを記録
             audit.write({
-                "ts_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+                "ts_utc": utc_now_iso(),
                 "event": "stage00_processed",
                 "src": src,
-                "out": out_path,
-                "done": done_path,
+                "out": getattr(c.get_success(), "path_display", None) or targets[i][0],
+                "done": getattr(m.get_success(), "path_display", None) or targets[i][1],
             })
-        except Exception as e:
+        else:
+            failed = True
             audit.write({
-                "ts_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+                "ts_utc": utc_now_iso(),
                 "event": "stage00_error",
                 "src": src,
-                "error": f"{type(e).__name__}: {e}",
+                "error": _entry_error(m if m is not None else c),
             })
-            # 1件でも失敗したら失敗扱い（安全側）
-            return 1
+    if failed:
+        # 1件でも失敗したら失敗扱い（安全側）
+        return 1
 
     # state に記録（最低限）
     try:
         state.stages.setdefault("00", {})
-        state.stages["00"]["last_run_utc"] = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+        state.stages["00"]["last_run_utc"] = utc_now_iso()
         state.stages["00"]["processed"] = processed
     except Exception:
         pass
 
     audit.write({
-        "ts_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "ts_utc": utc_now_iso(),
         "event": "stage00_summary",
         "processed": processed,
     })
@@ -11,6 +11,8 @@ import json
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
 
+from .json_codec import dumps_bytes
+
 
 @dataclass
 class StateStore:
@@ -44,8 +46,8 @@ class StateStore:
 
         try:
             _md, resp = dbx.files_download(state_path)
-            raw = resp.content.decode("utf-8", errors="replace")
-            obj = json.loads(raw)
+            # json.loads は bytes をそのまま受け取れる（UTF-8 を前提に decode を省く）
+            obj = json.loads(resp.content)
             if isinstance(obj, dict):
                 return cls.from_dict(obj)
             return cls()
@@ -59,7 +61,8 @@ class StateStore:
         """
         if not state_path:
             return
-        data = json.dumps(self.to_dict(), ensure_ascii=False, indent=2).encode("utf-8")
+        # 機械が読むだけなので整形なし（小さく・速く）
+        data = dumps_bytes(self.to_dict())
         # overwrite=True が欲しいが SDK 仕様で mode 指定
         import dropbox  # local import
 